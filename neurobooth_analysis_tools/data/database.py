@@ -1,11 +1,60 @@
+import os
+import zlib
+import warnings
+from glob import glob, escape as glob_escape
+from datetime import datetime
 import pandas as pd
 import numpy as np
 import sqlalchemy
 from typing import NamedTuple, List, Dict
-from time import sleep
+from time import sleep, time
+from concurrent.futures import ThreadPoolExecutor, Future
 
 from neurobooth_analysis_tools.data.types import DataException
 
+try:
+    from pyarrow import ArrowException
+except ImportError:  # Without pyarrow, to_parquet raises ImportError and tables are simply not cached
+    class ArrowException(Exception):
+        pass
+
+
+# Number of threads used to perform the fuzzy joins in DatabaseConnection.download
+JOIN_WORKERS: int = min(5, os.cpu_count() or 1)
+
+# Number of tables downloaded concurrently in DatabaseConnection.download_tables (each uses its own connection)
+DOWNLOAD_WORKERS: int = 8
+
+# Number of rows fetched at a time when downloading a table
+READ_CHUNK_SIZE: int = 50_000
+
+# Pooled connections older than this are replaced, as the Neurobooth database is recreated on an hourly basis
+POOL_RECYCLE_SEC: int = 1800
+
+# Pandas dtypes for PostgreSQL column types (as reported by information_schema.columns). Columns with other types fall
+# back to pandas dtype inference (convert_dtypes).
+POSTGRES_DTYPES: Dict[str, str] = {
+    'smallint': 'Int64',
+    'integer': 'Int64',
+    'bigint': 'Int64',
+    'real': 'Float64',
+    'double precision': 'Float64',
+    'numeric': 'Float64',
+    'boolean': 'boolean',
+    'text': 'string',
+    'character varying': 'string',
+    'character': 'string',
+    'USER-DEFINED': 'string',  # Enums
+    'uuid': 'string',
+}
+POSTGRES_DATE_TYPES = {'date', 'timestamp without time zone', 'timestamp with time zone'}
+
+# Where downloaded tables are cached on disk. Cached tables are reused for up to an hour.
+CACHE_DIR: str = os.path.join(os.path.expanduser('~'), '.cache', 'neurobooth')
+
+NS_PER_DAY: int = 86_400_000_000_000
+NAT_NS: int = np.iinfo(np.int64).min  # Integer representation of NaT
+
 
 class DatabaseException(DataException):
     """Exception for database-related errors."""
@@ -49,13 +98,30 @@ class DatabaseConnection:
 
     test_subjects: np.ndarray = None
 
-    def __init__(self, connection_info: DatabaseConnectionInfo):
-        """Create an object that can connect to the database, run queries or download tables, and cache results."""
+    def __init__(self, connection_info: DatabaseConnectionInfo, *, pool_pre_ping: bool = True):
+        """
+        Create an object that can connect to the database, run queries or download tables, and cache results.
+        :param connection_info: The information needed to connect to the database.
+        :param pool_pre_ping: Whether to test pooled connections before use. (Stale connections are otherwise only
+            replaced after pool_recycle seconds.) Disable if connecting through PgBouncer in transaction mode, in which
+            case POOL_RECYCLE_SEC should be shorter than the server_idle_timeout.
+        """
         self.connection_info = connection_info
-        self.engine = sqlalchemy.create_engine(self.connection_info.postgresql_url())
+        self.engine = sqlalchemy.create_engine(
+            self.connection_info.postgresql_url(),
+            pool_size=max(10, DOWNLOAD_WORKERS),
+            max_overflow=5,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=POOL_RECYCLE_SEC,
+            pool_timeout=30,
+        )
 
-    def download(self) -> None:
-        """Download tables likely to be useful for analysis and fuzzy-join them with sessions by date."""
+    def download(self, *, use_disk_cache: bool = False) -> None:
+        """
+        Download tables likely to be useful for analysis and fuzzy-join them with sessions by date.
+        :param use_disk_cache: Whether to use tables cached on disk within the past hour (if available) and to cache
+            newly downloaded tables. The cache holds subject data; only enable it on hosts where that is acceptable.
+        """
         # Download Tables
         tables = self.download_tables(
             'subject',
@@ -77,91 +143,174 @@ class DatabaseConnection:
             'rc_neuro_qol_participate_social_roles_short_form',
             'rc_neuro_qol_positive_affect_and_wellbeing_short_form',
             'rc_neuro_qol_sleep_disturbance_short_form',
+            use_disk_cache=use_disk_cache,
         )
 
         # Isolate tables that serve as the "left" side of the fuzzy joins.
-        self.subject = tables.pop('subject')
-        self.session = tables.pop('rc_visit_dates')
+        self.subject = tables['subject']
+        self.session = tables['rc_visit_dates']
         session_view = self.session[['subject_id', 'redcap_event_name', 'neurobooth_visit_dates']]
 
-        # Do a fuzzy redcap event join for clinical
-        self.clinical = tables.pop('rc_clinical_clean')
-        self.clinical = fuzzy_join_redcap_event(
-            session_view, self.clinical,
-            hard_on=['subject_id'], offset_column_name='clinical_offset_visits', how='left',
-        )
+        # The joins are independent and spend most of their time in pandas C code, so run them in threads
+        with ThreadPoolExecutor(max_workers=JOIN_WORKERS) as executor:
+            def join_date(table_name: str, date_column: str, column_prefix: str) -> Future:
+                return executor.submit(
+                    fuzzy_join_date, session_view, tables[table_name],
+                    hard_on=['subject_id'], fuzzy_on_left='neurobooth_visit_dates', fuzzy_on_right=date_column,
+                    offset_column_name=f'{column_prefix}_offset_days', how='left',
+                )
+
+            # Do a fuzzy redcap event join for clinical
+            clinical = executor.submit(
+                fuzzy_join_redcap_event, session_view, tables['rc_clinical_clean'],
+                hard_on=['subject_id'], offset_column_name='clinical_offset_visits', how='left',
+            )
 
-        # Do a fuzzy date join for everything else
-        join_keys = {
-            'rc_demographic_clean': 'end_time_demographic',
-            'rc_ataxia_pd_scales_clean': 'visit_date',
-            'rc_visual_activities_questionnaire': 'end_time_visual_activities_questionnaire',
-            'rc_prom_ataxia': 'end_time_prom_ataxia',
-            'rc_dysarthria_impact_scale': 'end_time_dysarthria_impact_scale',
-            'rc_communicative_participation_item_bank': 'end_time_communicative_participation_item_bank',
-            'rc_neuro_qol_anxiety_short_form': 'end_time_neuro_qol_anxiety_short_form',
-            'rc_neuro_qol_cognitive_function_short_form': 'end_time_neuro_qol_cognitive_function_short_form',
-            'rc_neuro_qol_depression_short_form': 'end_time_neuro_qol_depression_short_form',
-            'rc_neuro_qol_emotional_dyscontrol_short_form': 'end_time_neuro_qol_emotional_dyscontrol_short_form',
-            'rc_neuro_qol_fatigue_short_form': 'end_time_neuro_qol_fatigue_short_form',
-            'rc_neuro_qol_le_short_form': 'end_time_neuro_qol_le_short_form',
-            'rc_neuro_qol_ue_short_form': 'end_time_neuro_qol_ue_short_form',
-            'rc_neuro_qol_participate_social_roles_short_form': 'end_time_neuro_qol_participate_social_roles_short_form',
-            'rc_neuro_qol_positive_affect_and_wellbeing_short_form': 'end_time_neuro_qol_positive_affect_and_wellbeing_short_form',
-            'rc_neuro_qol_sleep_disturbance_short_form': 'end_time_neuro_qol_sleep_disturbance_short_form',
-        }
-        new_column_prefix = {
-            'rc_demographic_clean': 'demographic',
-            'rc_ataxia_pd_scales_clean': 'scales',
-            'rc_visual_activities_questionnaire': 'vaq',
-            'rc_prom_ataxia': 'prom_ataxia',
-            'rc_dysarthria_impact_scale': 'dis',
-            'rc_communicative_participation_item_bank': 'cpib',
-            'rc_neuro_qol_anxiety_short_form': 'nqol_anxiety',
-            'rc_neuro_qol_cognitive_function_short_form': 'nqol_cognitive',
-            'rc_neuro_qol_depression_short_form': 'nqol_depression',
-            'rc_neuro_qol_emotional_dyscontrol_short_form': 'nqol_emotional_dyscontrol',
-            'rc_neuro_qol_fatigue_short_form': 'nqol_fatigue',
-            'rc_neuro_qol_le_short_form': 'nqol_le',
-            'rc_neuro_qol_ue_short_form': 'nqol_ue',
-            'rc_neuro_qol_participate_social_roles_short_form': 'nqol_social_role_participation',
-            'rc_neuro_qol_positive_affect_and_wellbeing_short_form': 'nqol_wellbeing',
-            'rc_neuro_qol_sleep_disturbance_short_form': 'nqol_sleep_disturbance',
-        }
-        tables = {
-            name: fuzzy_join_date(
-                session_view, table,
-                hard_on=['subject_id'], fuzzy_on_left='neurobooth_visit_dates', fuzzy_on_right=join_keys[name],
-                offset_column_name=f'{new_column_prefix[name]}_offset_days',
-                how='left'
+            # Do a fuzzy date join for everything else
+            demographic = join_date('rc_demographic_clean', 'end_time_demographic', 'demographic')
+            scales = join_date('rc_ataxia_pd_scales_clean', 'visit_date', 'scales')
+            prom_vaq = join_date(
+                'rc_visual_activities_questionnaire', 'end_time_visual_activities_questionnaire', 'vaq'
+            )
+            prom_ataxia = join_date('rc_prom_ataxia', 'end_time_prom_ataxia', 'prom_ataxia')
+            prom_dis = join_date('rc_dysarthria_impact_scale', 'end_time_dysarthria_impact_scale', 'dis')
+            prom_cpib = join_date(
+                'rc_communicative_participation_item_bank', 'end_time_communicative_participation_item_bank', 'cpib'
+            )
+            prom_nqol_anxiety = join_date(
+                'rc_neuro_qol_anxiety_short_form', 'end_time_neuro_qol_anxiety_short_form', 'nqol_anxiety'
+            )
+            prom_nqol_cognitive = join_date(
+                'rc_neuro_qol_cognitive_function_short_form', 'end_time_neuro_qol_cognitive_function_short_form',
+                'nqol_cognitive',
+            )
+            prom_nqol_depression = join_date(
+                'rc_neuro_qol_depression_short_form', 'end_time_neuro_qol_depression_short_form', 'nqol_depression'
+            )
+            prom_nqol_emotional_dyscontrol = join_date(
+                'rc_neuro_qol_emotional_dyscontrol_short_form', 'end_time_neuro_qol_emotional_dyscontrol_short_form',
+                'nqol_emotional_dyscontrol',
+            )
+            prom_nqol_fatigue = join_date(
+                'rc_neuro_qol_fatigue_short_form', 'end_time_neuro_qol_fatigue_short_form', 'nqol_fatigue'
+            )
+            prom_nqol_lower_extremity = join_date(
+                'rc_neuro_qol_le_short_form', 'end_time_neuro_qol_le_short_form', 'nqol_le'
+            )
+            prom_nqol_upper_extremity = join_date(
+                'rc_neuro_qol_ue_short_form', 'end_time_neuro_qol_ue_short_form', 'nqol_ue'
             )
-            for name, table in tables.items()
-        }
-        self.demographic = tables['rc_demographic_clean']
-        self.scales = tables['rc_ataxia_pd_scales_clean']
-        self.prom_vaq = tables['rc_visual_activities_questionnaire']
-        self.prom_ataxia = tables['rc_prom_ataxia']
-        self.prom_dis = tables['rc_dysarthria_impact_scale']
-        self.prom_cpib = tables['rc_communicative_participation_item_bank']
-        self.prom_nqol_cognitive = tables['rc_neuro_qol_cognitive_function_short_form']
-        self.prom_nqol_fatigue = tables['rc_neuro_qol_fatigue_short_form']
-        self.prom_nqol_depression = tables['rc_neuro_qol_depression_short_form']
-        self.prom_nqol_emotional_dyscontrol = tables['rc_neuro_qol_emotional_dyscontrol_short_form']
-        self.prom_nqol_anxiety = tables['rc_neuro_qol_anxiety_short_form']
-        self.prom_nqol_lower_extremity = tables['rc_neuro_qol_le_short_form']
-        self.prom_nqol_upper_extremity = tables['rc_neuro_qol_ue_short_form']
-        self.prom_nqol_social_role_participation = tables['rc_neuro_qol_participate_social_roles_short_form']
-        self.prom_nqol_wellbeing = tables['rc_neuro_qol_positive_affect_and_wellbeing_short_form']
-        self.prom_nqol_sleep_disturbance = tables['rc_neuro_qol_sleep_disturbance_short_form']
-
-    def download_tables(self, *table_names: str) -> Dict[str, pd.DataFrame]:
-        """Download and return the specified tables from the database"""
-        DatabaseConnection.wait_for_refresh(self.engine, *table_names)
+            prom_nqol_social_role_participation = join_date(
+                'rc_neuro_qol_participate_social_roles_short_form',
+                'end_time_neuro_qol_participate_social_roles_short_form',
+                'nqol_social_role_participation',
+            )
+            prom_nqol_wellbeing = join_date(
+                'rc_neuro_qol_positive_affect_and_wellbeing_short_form',
+                'end_time_neuro_qol_positive_affect_and_wellbeing_short_form',
+                'nqol_wellbeing',
+            )
+            prom_nqol_sleep_disturbance = join_date(
+                'rc_neuro_qol_sleep_disturbance_short_form', 'end_time_neuro_qol_sleep_disturbance_short_form',
+                'nqol_sleep_disturbance',
+            )
+
+        self.clinical = clinical.result()
+        self.demographic = demographic.result()
+        self.scales = scales.result()
+        self.prom_vaq = prom_vaq.result()
+        self.prom_ataxia = prom_ataxia.result()
+        self.prom_dis = prom_dis.result()
+        self.prom_cpib = prom_cpib.result()
+        self.prom_nqol_anxiety = prom_nqol_anxiety.result()
+        self.prom_nqol_cognitive = prom_nqol_cognitive.result()
+        self.prom_nqol_depression = prom_nqol_depression.result()
+        self.prom_nqol_emotional_dyscontrol = prom_nqol_emotional_dyscontrol.result()
+        self.prom_nqol_fatigue = prom_nqol_fatigue.result()
+        self.prom_nqol_lower_extremity = prom_nqol_lower_extremity.result()
+        self.prom_nqol_upper_extremity = prom_nqol_upper_extremity.result()
+        self.prom_nqol_social_role_participation = prom_nqol_social_role_participation.result()
+        self.prom_nqol_wellbeing = prom_nqol_wellbeing.result()
+        self.prom_nqol_sleep_disturbance = prom_nqol_sleep_disturbance.result()
+
+    def download_tables(self, *table_names: str, use_disk_cache: bool = False) -> Dict[str, pd.DataFrame]:
+        """
+        Download and return the specified tables from the database
+        :param table_names: The tables to download.
+        :param use_disk_cache: Whether to use tables cached on disk within the past hour (if available) and to cache
+            newly downloaded tables. The cache holds subject data; only enable it on hosts where that is acceptable.
+        :return: A dictionary mapping each table name to its contents.
+        """
+        cache_paths = {table_name: self._cache_path(table_name, 'parquet') for table_name in table_names}
+        tables = {}
+        if use_disk_cache:
+            for table_name in table_names:
+                table = _read_cache(cache_paths[table_name], pd.read_parquet)
+                if table is not None:
+                    tables[table_name] = table
+
+        to_download = [name for name in table_names if name not in tables]
+        if not to_download:
+            return tables
+        DatabaseConnection.wait_for_refresh(self.engine, *to_download)
+        column_types = self.get_column_types(*to_download)
+
+        def read_table(table_name: str) -> pd.DataFrame:
+            # Use the declared column types rather than inferring dtypes from the data (e.g., convert_dtypes).
+            # Inference is only used as a fallback for columns whose types are not mapped or were not reported.
+            dtypes, date_columns = {}, []
+            for column, data_type in column_types[table_name].items():
+                if data_type in POSTGRES_DATE_TYPES:
+                    date_columns.append(column)
+                elif data_type in POSTGRES_DTYPES:
+                    dtypes[column] = POSTGRES_DTYPES[data_type]
+
+            # Stream the table in chunks using a server-side cursor to bound peak memory usage
+            with self.engine.connect().execution_options(stream_results=True) as connection:
+                chunks = pd.read_sql_table(
+                    table_name, connection, parse_dates=date_columns, chunksize=READ_CHUNK_SIZE
+                )
+                table = pd.concat(chunks, ignore_index=True)
+            table = table.astype({column: dtype for column, dtype in dtypes.items() if column in table.columns})
+            for column in table.columns.difference([*dtypes, *date_columns]):
+                table[column] = table[column].convert_dtypes()
+            if use_disk_cache:
+                _write_cache(cache_paths[table_name], lambda f: table.to_parquet(f, compression='zstd'))
+            return table
+
+        # Overlap the round-trips for each table by downloading them on separate pooled connections
+        with ThreadPoolExecutor(max_workers=max(1, min(DOWNLOAD_WORKERS, len(to_download)))) as executor:
+            tables.update(zip(to_download, executor.map(read_table, to_download)))
+        return {table_name: tables[table_name] for table_name in table_names}
+
+    def get_column_types(self, *table_names: str) -> Dict[str, Dict[str, str]]:
+        """
+        Look up the declared type of each column in the specified tables.
+        :param table_names: The tables to look up.
+        :return: A dictionary mapping each table name to a dictionary of column name -> PostgreSQL data type.
+        """
+        query = sqlalchemy.text('''
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = ANY(:table_names)
+        ORDER BY table_name, ordinal_position
+        ''')
+
+        column_types = {table_name: {} for table_name in table_names}
         with self.engine.connect() as connection:
-            return {
-                table_name: pd.read_sql_table(table_name, connection).convert_dtypes()
-                for table_name in table_names
-            }
+            for table_name, column_name, data_type in connection.execute(query, {'table_names': list(table_names)}):
+                column_types[table_name][column_name] = data_type
+        return column_types
+
+    def _cache_path(self, name: str, extension: str) -> str:
+        """
+        Determine the cache file for the given name under the current hour-long time bucket.
+        The bucket boundary is skewed by a hash of the name so that not all cached tables expire at once.
+        """
+        skew_sec = zlib.crc32(name.encode()) % 3600
+        bucket = datetime.fromtimestamp(time() - skew_sec).strftime('%Y%m%d%H')
+        cache_dir = os.path.join(CACHE_DIR, f'{self.connection_info.host}_{self.connection_info.dbname}')
+        return os.path.join(cache_dir, f'{name}_{bucket}.{extension}')
 
     @staticmethod
     def wait_for_refresh(
@@ -175,9 +324,13 @@ class DatabaseConnection:
         This method checks if the all tables exist. If not, it will block and periodically recheck until either the
         tables exist or the maximum number of checks is reached.
         """
+        inspection = sqlalchemy.inspect(engine)
         for _ in range(max_polls):
-            inspection = sqlalchemy.inspect(engine)
-            exists = all([inspection.has_table(table) for table in table_names])
+            # Fetch all table and view names at once rather than issuing a has_table query per table.
+            # (On PostgreSQL, the view names include materialized views.)
+            inspection.info_cache.clear()  # Names are otherwise cached by the inspector
+            relations = {*inspection.get_table_names(), *inspection.get_view_names()}
+            exists = set(table_names).issubset(relations)
             if exists:
                 return
             else:
@@ -187,15 +340,24 @@ class DatabaseConnection:
             f"Exceeded maximum polls (N={max_polls}) when checking for existence of: {', '.join(table_names)}."
         )
 
-    def get_test_subjects(self, *, use_cache: bool = True) -> np.ndarray:
+    def get_test_subjects(self, *, use_cache: bool = True, use_disk_cache: bool = False) -> np.ndarray:
         """
         Determine which subject IDs correspond to test subjects based on the database.
         :param use_cache: Whether to used cached results (if available) or re-query the database.
+        :param use_disk_cache: Whether to also use results cached on disk within the past hour (if available) and to
+            cache newly queried results there.
         :return: An array of subject IDs that are test subjects.
         """
         if use_cache and self.test_subjects is not None:
             return self.test_subjects
 
+        cache_path = self._cache_path('test_subjects', 'npy')
+        if use_cache and use_disk_cache:
+            test_subjects = _read_cache(cache_path, np.load)
+            if test_subjects is not None:
+                self.test_subjects = test_subjects
+                return self.test_subjects
+
         # Test subjects will either be:
         #   1) missing from the redcap-generated consent table (but present in the subject table), or
         #   2) flagged as a test subject in the consent table
@@ -210,10 +372,62 @@ class DatabaseConnection:
 
         DatabaseConnection.wait_for_refresh(self.engine, 'rc_participant_and_consent_information')
         with self.engine.connect() as connection:
-            self.test_subjects = pd.read_sql(query, connection).convert_dtypes().to_numpy(dtype='U').squeeze()
+            subject_ids = connection.execute(sqlalchemy.text(query)).scalars().all()
+        self.test_subjects = np.array(subject_ids, dtype='U')
+        if use_disk_cache:
+            _write_cache(cache_path, lambda f: np.save(f, self.test_subjects))
         return self.test_subjects
 
 
+def _read_cache(path: str, read_func):
+    """
+    Read a cache file using the given function.
+    Caching is best-effort: if the file is missing or cannot be read, None is returned (with a warning for unreadable
+    files) so that the caller falls back to the database.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        return read_func(path)
+    except FileNotFoundError:  # Likely removed concurrently by another process's stale-bucket cleanup
+        return None
+    except (OSError, ValueError, EOFError, ArrowException) as e:
+        warnings.warn(f'Unable to read cache file {path}: {e}')
+        return None
+
+
+def _write_cache(path: str, write_func) -> None:
+    """
+    Atomically write a cache file using the given function and remove stale cache files for the same name.
+    Caching is best-effort: if the file cannot be written, a warning is issued and the cache is left as it was.
+    Cached files may contain subject data, so the cache directory and files are only accessible to the current user.
+    """
+    base, extension = os.path.splitext(path)
+    tmp_path = f'{base}.{os.getpid()}.tmp{extension}'
+    try:
+        cache_dir = os.path.dirname(path)
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        os.chmod(cache_dir, 0o700)  # In case the directory already existed with broader permissions
+        write_func(tmp_path)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except (OSError, ImportError, ArrowException) as e:
+        warnings.warn(f'Unable to write cache file {path}: {e}')
+        return
+    finally:
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+
+    name, _ = base.rsplit('_', maxsplit=1)  # Strip the time bucket
+    for stale_path in glob(f'{glob_escape(name)}_{"[0-9]" * 10}{extension}'):
+        if stale_path == path:
+            continue
+        try:
+            os.remove(stale_path)
+        except OSError:  # Likely removed concurrently by another process
+            pass
+
+
 def fuzzy_join_redcap_event(
         left_df: pd.DataFrame,
         right_df: pd.DataFrame,
@@ -246,16 +460,17 @@ def fuzzy_join_redcap_event(
     # Calculate number of visits (signed) between each redcap event
     possible_matches[offset_column_name] = possible_matches['__Visit_Num_L__'] - possible_matches['__Visit_Num_R__']
 
-    # Rank possible matches based on proximity; Only look at positive offset
-    possible_matches = possible_matches.loc[possible_matches[offset_column_name] >= 0].copy()
-    possible_matches['__Rank__'] = possible_matches \
-        .groupby([*hard_on, '__Visit_Num_L__'])[offset_column_name] \
-        .rank(method='min', na_option='bottom')
-
-    # Only keep the best matches (rank 1)
-    mask = possible_matches['__Rank__'] == 1
-    possible_matches = possible_matches.loc[mask]
-    return possible_matches.drop(columns=['__Rank__', '__Visit_Num_R__', '__Visit_Num_L__'])  # No longer needed
+    # Only keep the best matches (smallest positive offset); a per-group minimum avoids ranking every possible match.
+    # Non-positive offsets are masked out of the minimum so that only one filtered copy of the matches is made.
+    offset = possible_matches[offset_column_name]
+    best_offset = offset \
+        .where(offset >= 0) \
+        .groupby([possible_matches[col] for col in [*hard_on, '__Visit_Num_L__']]) \
+        .transform('min')
+    possible_matches = possible_matches.loc[(offset == best_offset).fillna(False)]
+    possible_matches.reset_index(drop=True, inplace=True)
+    possible_matches.drop(columns=['__Visit_Num_R__', '__Visit_Num_L__'], inplace=True)  # No longer needed
+    return possible_matches
 
 
 def fuzzy_join_date(
@@ -269,6 +484,9 @@ def fuzzy_join_date(
 ) -> pd.DataFrame:
     """
     Do a fuzzy join based on two date columns, where the closest match between the dates is selected.
+    The nearest match for each left row is found in a single sorted pass (pd.merge_asof) rather than by ranking all
+    possible matches; if several right rows are equally close, only one of them is kept. Left rows without a date or
+    with a missing hard join key are not included in the result.
 
     :param left_df: The left dataframe in the join
     :param right_df: The right dataframe in the join
@@ -277,22 +495,43 @@ def fuzzy_join_date(
     :param fuzzy_on_right:  The date column to be used in the right dataframe
     :param offset_column_name:  The name of the column that will contain the calculated date offset
     :param kwargs: Any kwargs that should be passed on to the join (e.g., 'how' to specify join type)
-    :return: The joined dataframe, with an added column for the separation of the joined dates.
+    :return: The joined dataframe, with an added column for the separation of the joined dates (rounded to whole
+        days, stored as Int32).
     """
-    right_df = right_df.dropna(subset=fuzzy_on_right)
-    possible_matches = pd.merge(left_df, right_df, on=hard_on, **kwargs)
-
-    # Calculate number of days (signed) between each date column in the fuzzy join
-    possible_matches[offset_column_name] = possible_matches[fuzzy_on_right] - possible_matches[fuzzy_on_left]
-    possible_matches[offset_column_name] /= np.timedelta64(1, 'D')  # Convert to days
-
-    # Rank possible matches based on proximity
-    possible_matches['__Rank__'] = possible_matches[offset_column_name].abs()
-    possible_matches['__Rank__'] = possible_matches \
-        .groupby([*hard_on, fuzzy_on_left])['__Rank__'] \
-        .rank(method='min', na_option='bottom')
-
-    # Only keep the best matches (rank 1)
-    mask = possible_matches['__Rank__'] == 1
-    possible_matches = possible_matches.loc[mask]
-    return possible_matches.drop(columns='__Rank__')  # No longer needed
+    # Missing join keys never match (merge_asof would otherwise pair missing hard keys with each other)
+    left_df = left_df.dropna(subset=[*hard_on, fuzzy_on_left]).reset_index(drop=True)  # Modified below
+    right_df = right_df.dropna(subset=[*hard_on, fuzzy_on_right])
+    right_df.reset_index(drop=True, inplace=True)  # dropna already made a copy
+
+    # Find the index of the closest right row for each left row.
+    # merge_asof requires sorted keys of the same dtype, so the hard keys are cast to the left dtypes (e.g., string vs
+    # object) and both dates are brought to nanosecond resolution (as_unit keeps any timezone, unlike astype).
+    left_keys = left_df[hard_on].assign(**{fuzzy_on_left: left_df[fuzzy_on_left].dt.as_unit('ns')}) \
+        .sort_values(fuzzy_on_left)
+    right_keys = right_df[hard_on].astype(left_df[hard_on].dtypes.to_dict()) \
+        .assign(**{fuzzy_on_right: right_df[fuzzy_on_right].dt.as_unit('ns')}) \
+        .assign(__Match__=right_df.index) \
+        .sort_values(fuzzy_on_right)
+    nearest = pd.merge_asof(
+        left_keys, right_keys,
+        left_on=fuzzy_on_left, right_on=fuzzy_on_right, by=hard_on, direction='nearest',
+    )
+    left_df['__Match__'] = pd.Series(nearest['__Match__'].to_numpy(), index=left_keys.index).astype('Int64')
+
+    # Perform the actual join against the best match
+    matches = pd.merge(
+        left_df, right_df.drop(columns=hard_on),
+        left_on='__Match__', right_index=True, **kwargs,
+    )
+    matches.reset_index(drop=True, inplace=True)
+    del matches['__Match__']  # No longer needed
+
+    # Calculate number of days (signed) between each date column in the fuzzy join.
+    # Work on the raw nanosecond integers to avoid the overhead of pandas timedelta arithmetic.
+    right_ns = matches[fuzzy_on_right].to_numpy(dtype='datetime64[ns]').view('i8')
+    left_ns = matches[fuzzy_on_left].to_numpy(dtype='datetime64[ns]').view('i8')
+    offset_days = (right_ns - left_ns) / NS_PER_DAY
+    offset_days[(right_ns == NAT_NS) | (left_ns == NAT_NS)] = np.nan
+    # Whole days; <NA> if no match. Int32 holds any offset between datetime64[ns] values (at most ~106,000 days).
+    matches[offset_column_name] = pd.array(np.round(offset_days), dtype='Int32')
+    return matches
@@ -6,7 +6,8 @@ import numpy as np
 import pandas as pd
 from scipy.signal import butter, sosfiltfilt
 import matplotlib.pyplot as plt
-from typing import List, Optional, Any, Literal
+from matplotlib.collections import LineCollection
+from typing import List, Optional, Any, Literal, Tuple
 
 from neurobooth_analysis_tools.task.mot import MOTTrial
 from neurobooth_analysis_tools.preprocess.gaze.event import exclude_blink_saccades
@@ -22,14 +23,45 @@ SCREEN_RATIO = (X_RANGE[1]-X_RANGE[0]) / (Y_RANGE[1]-Y_RANGE[0])
 GAZE_SOS_COEF = butter(7, 100 / (1000 / 2), btype='lowpass', output='sos')
 
 
+# Figure reused by make_shared_trial_grid: (plot size, figure, axes)
+_shared_trial_grid: Optional[Tuple[float, plt.Figure, List[plt.Axes]]] = None
+
+
 def make_trial_grid(plot_size: float = 4) -> (plt.Figure, List[plt.Axes]):
     plot_height = plot_size
     plot_width = plot_size * SCREEN_RATIO
 
-    fig, axs = plt.subplots(4, 5, figsize=(5*plot_height, 4*plot_width))
+    # Dense gaze/mouse traces are rasterized; the figure DPI sets their resolution in vector output
+    fig, axs = plt.subplots(4, 5, figsize=(5*plot_height, 4*plot_width), dpi=150)
     return fig, axs.flatten()
 
 
+def make_shared_trial_grid(plot_size: float = 4) -> (plt.Figure, List[plt.Axes]):
+    """
+    Like make_trial_grid, but reuses the same figure (with cleared axes) across calls to avoid the cost of creating a
+    new figure for each session when batch plotting. Callers must save or show the figure before the next call and must
+    not retain it afterward.
+    """
+    global _shared_trial_grid
+    if _shared_trial_grid is not None:
+        shared_size, fig, axs = _shared_trial_grid
+        if plt.fignum_exists(fig.number):
+            if shared_size == plot_size:
+                reset_trial_grid(axs)
+                return fig, axs
+            plt.close(fig)  # Size changed; release the old figure so pyplot does not keep it alive
+
+    fig, axs = make_trial_grid(plot_size)
+    _shared_trial_grid = (plot_size, fig, axs)
+    return fig, axs
+
+
+def reset_trial_grid(axs: List[plt.Axes]) -> None:
+    """Clear all axes in a trial grid so that it can be reused."""
+    for ax in axs:
+        ax.cla()
+
+
 def plot_marker_animation(
         ax: plt.Axes,
         marker_data: MOTTrial,
@@ -40,14 +72,12 @@ def plot_marker_animation(
         endpoint_marker_area: float = 25,
         gaze_linewidth: float = 0.5,
         margin: float = 20,
+        gaze_sorted: Optional[bool] = None,
 ) -> None:
     _plot_marker_trajectories(ax, marker_data, path_linewidth, endpoint_marker_area, target_color, nontarget_color)
 
     if gaze_pos is not None:
-        gaze_pos = gaze_pos.loc[
-            (gaze_pos['Time_LSL'] >= marker_data.start_time) &
-            (gaze_pos['Time_LSL'] <= marker_data.animation_end_time)
-        ]
+        gaze_pos = _slice_time(gaze_pos, marker_data.start_time, marker_data.animation_end_time, gaze_sorted)
         _plot_gaze(ax, 'R', gaze_pos, gaze_linewidth)
         _plot_gaze(ax, 'L', gaze_pos, gaze_linewidth)
         ax.legend()
@@ -66,26 +96,24 @@ def plot_clicks(
         gaze_linewidth: float = 0.5,
         mouse_linewidth: float = 0.5,
         margin: float = 20,
+        gaze_sorted: Optional[bool] = None,
+        mouse_sorted: Optional[bool] = None,
 ) -> None:
     _plot_marker_trajectories(ax, marker_data, None, endpoint_marker_area, target_color, nontarget_color)
     duration = marker_data.end_time - marker_data.animation_end_time
     ax.set_title(f'{ax.get_title()} ({duration:.1f} s)')
 
     if gaze_pos is not None:
-        gaze_pos = gaze_pos.loc[
-            (gaze_pos['Time_LSL'] >= marker_data.animation_end_time) &
-            (gaze_pos['Time_LSL'] <= marker_data.end_time)
-        ]
+        gaze_pos = _slice_time(gaze_pos, marker_data.animation_end_time, marker_data.end_time, gaze_sorted)
         _plot_gaze(ax, 'R', gaze_pos, gaze_linewidth)
         _plot_gaze(ax, 'L', gaze_pos, gaze_linewidth)
 
     if mouse_pos is not None:
-        mouse_pos = mouse_pos.loc[
-            (mouse_pos['Time_LSL'] >= marker_data.animation_end_time) &
-            (mouse_pos['Time_LSL'] <= marker_data.end_time)
-            ]
-
-        ax.plot(mouse_pos['PosX'], mouse_pos['PosY'], color='b', linewidth=mouse_linewidth, label='Mouse')
+        mouse_pos = _slice_time(mouse_pos, marker_data.animation_end_time, marker_data.end_time, mouse_sorted)
+        ax.plot(
+            mouse_pos['PosX'], mouse_pos['PosY'],
+            color='b', linewidth=mouse_linewidth, label='Mouse', rasterized=True,
+        )
         click_mask = mouse_pos['MouseState'] == 'Click'
         ax.scatter(
             mouse_pos.loc[click_mask, 'PosX'], mouse_pos.loc[click_mask, 'PosY'],
@@ -96,6 +124,22 @@ def plot_clicks(
     _configure_trial_plot_axes(ax, margin)
 
 
+def _slice_time(df: pd.DataFrame, start: float, end: float, is_sorted: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Select rows where start <= Time_LSL <= end. Uses a binary search when Time_LSL is sorted (the usual case).
+    Checking whether Time_LSL is sorted requires a full pass over the column, so callers plotting many trials from the
+    same stream should check once (Time_LSL.is_monotonic_increasing) and pass the result as is_sorted.
+    """
+    ts = df['Time_LSL']
+    if is_sorted is None:
+        is_sorted = ts.is_monotonic_increasing
+    if not is_sorted:
+        return df.loc[(ts >= start) & (ts <= end)]
+    i0 = ts.searchsorted(start, side='left')
+    i1 = ts.searchsorted(end, side='right')
+    return df.iloc[i0:i1]
+
+
 def _configure_trial_plot_axes(ax: plt.Axes, margin: float) -> None:
     ax.set_xticks(np.linspace(*X_RANGE, 5))
     ax.set_yticks(np.linspace(*Y_RANGE, 5))
@@ -112,16 +156,17 @@ def _plot_marker_trajectories(
         nontarget_color: Any = '#ccb974',
         set_title: bool = True,
 ) -> None:
-    circle_ids = marker_data.circle_paths['MarkerTgt'].unique()
-    for cid in sorted(circle_ids):
-        color = target_color if cid < marker_data.n_targets else nontarget_color
-        paths = marker_data.circle_paths.loc[marker_data.circle_paths['MarkerTgt'] == cid]
-        if path_linewidth is not None:
-            ax.plot(paths['MarkerX'], paths['MarkerY'], color=color, linewidth=path_linewidth)
-        ax.scatter(
-            paths['MarkerX'].iloc[-1], paths['MarkerY'].iloc[-1],
-            color=color, s=endpoint_marker_area,
-        )
+    # Gather all paths so that they can be drawn with a single artist each for the lines and endpoints
+    segments, colors = [], []
+    n_targets = marker_data.n_targets
+    for cid, paths in marker_data.circle_paths.groupby('MarkerTgt', sort=True):
+        segments.append(np.column_stack([paths['MarkerX'].to_numpy(), paths['MarkerY'].to_numpy()]))
+        colors.append(target_color if cid < n_targets else nontarget_color)
+
+    if path_linewidth is not None:
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=path_linewidth))
+    endpoints = np.array([seg[-1] for seg in segments]).reshape(-1, 2)
+    ax.scatter(endpoints[:, 0], endpoints[:, 1], c=colors, s=endpoint_marker_area)
 
     if set_title:
         ax.set_title(f"{'Practice: ' if marker_data.practice else ''}{marker_data.n_targets} dots")
@@ -138,7 +183,7 @@ def _plot_gaze(ax: plt.Axes, eye: Literal['L', 'R'], gaze_pos: pd.DataFrame, lin
 
     x, y = _exclude_blinks(gaze_pos[f'{eye}_GazeX'].to_numpy(), gaze_pos[f'{eye}_GazeY'].to_numpy(), blink)
     color = 'k' if eye == 'R' else 'gray'
-    ax.plot(x, y, color=color, alpha=0.7, linewidth=linewidth, label=f'{eye} Gaze')
+    ax.plot(x, y, color=color, alpha=0.7, linewidth=linewidth, label=f'{eye} Gaze', rasterized=True)
 
 
 def _exclude_blinks(